@@ -6,6 +6,7 @@ along with incident sorting algorithms and logging capabilities.
 """
 
 import json
+import weakref
 from datetime import datetime, timedelta
 from typing import List, Dict, Tuple, Optional
 import heapq
@@ -80,6 +81,7 @@ class IncidentScheduler:
         self.incidents = []
         self.log_file = log_file
         self.resource_inventory = {}  # {resource_type: [available_resource_ids]}
+        self._event_log = None  # opened on first log_event, closed by close() or on collection
         self.load_incidents()
     
     def add_incident(self, incident: Incident):
@@ -293,9 +295,18 @@ class IncidentScheduler:
         log_entry = f"[{timestamp}] {message}"
         print(log_entry)
         
-        # Also append to a text log file
-        with open("incident_events.log", "a") as f:
-            f.write(log_entry + "\n")
+        # Also append to a text log file, reusing one handle instead of reopening it
+        if self._event_log is None:
+            self._event_log = open("incident_events.log", "a")
+            self._close_event_log = weakref.finalize(self, self._event_log.close)
+        self._event_log.write(log_entry + "\n")
+        self._event_log.flush()
+    
+    def close(self):
+        """Close the event log file"""
+        if self._event_log is not None:
+            self._close_event_log()
+            self._event_log = None
     
     def save_incidents(self):
         """Save incidents to JSON file"""
@@ -1,13 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import math
+import heapq
 import networkx as nx
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import random
-from datetime import datetime, timedelta
+from operator import itemgetter
+from types import MappingProxyType
+from datetime import datetime
 from incident_scheduling import IncidentScheduler, Incident, Resource, IncidentType, Priority
 
+RESOURCE_TYPES = ('Fire Trucks', 'Ambulances', 'Police Cars')
+NODE_LABELS = ['HQ', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+
+# ─────────── Time (minutes since midnight) ───────────
+def format_minutes(minutes):
+    """Format minutes since midnight as HH:MM"""
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
+
 # ─────────── Sorting (Merge Sort) ───────────
 def merge_sort(lst, key=lambda x: x):
     if len(lst) <= 1:
@@ -69,20 +78,25 @@ class EmergencyResponseManager:
         style = ttk.Style(self.root)
         style.theme_use('clam')
         font_name = 'Comic Sans MS'  
+        F12 = (font_name, 12)
+        F16 = (font_name, 16)
+        F14B = (font_name, 14, "bold")
 
         # Style configurations
         style.configure('TLabelframe', background='#001f3f', borderwidth=0, relief='flat')
-        style.configure('TLabelframe.Label', background='#001f3f', foreground='white', font=(font_name, 16))
+        style.configure('TLabelframe.Label', background='#001f3f', foreground='white', font=F16)
         style.configure('TFrame', background='#001f3f')
-        style.configure('TButton', font=(font_name, 12), relief='ridge', padding=6,
+        style.configure('TButton', font=F12, relief='ridge', padding=6,
                         background='#004080', foreground='white')
         style.map('TButton', background=[('active', '#0059b3')])
-        style.configure('TLabel', background='#001f3f', foreground='white', font=(font_name, 12))
+        style.configure('TLabel', background='#001f3f', foreground='white', font=F12)
         style.configure('TCombobox', fieldbackground='#003366', background='#003366',
-                        foreground='white', font=(font_name, 12))
-        style.configure('Accent.TButton', font=(font_name, 14, "bold"))
-        style.configure("Time.TCombobox", fieldbackground='#003366',background='#003366', foreground="white", arrowcolor="black")
+                        foreground='white', font=F12)
+        style.configure('Accent.TButton', font=F14B)
+        # Colors are inherited from TCombobox; only the arrow and readonly state differ
+        style.configure("Time.TCombobox", arrowcolor="black")
         style.map("Time.TCombobox",fieldbackground=[("readonly", '#003366')],background=[("readonly", '#003366')],foreground=[("!disabled", "white")])
+        style.configure('Incidents.Treeview', background='#003366', fieldbackground='#003366', foreground='white')
         
         # Store incidents and tracking variables
         self.incidents = []
@@ -92,18 +106,27 @@ class EmergencyResponseManager:
         # City graph initialization
         self.G = self.build_city_graph()
         self.initialize_resources(self.G)
+
+        # All-pairs shortest paths, solved once in build_city_graph
+        self._dist = self.G.graph['_dist']
+        self._path = self.G.graph['_paths']
+        
+        # Snapshot of the starting resource counts, copied per optimization run
+        self._pristine_resources = {
+            n: {rt: self.G.nodes[n][rt] for rt in RESOURCE_TYPES} for n in self.G.nodes
+        }
         
         # Node options for locations
-        self.node_labels = ['HQ', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+        self.node_labels = NODE_LABELS
         
-        # Priority colors
-        self.priority_colors = {
+        # Priority colors (read-only)
+        self.priority_colors = MappingProxyType({
             Priority.CRITICAL: "#ff0000",  # Red
             Priority.HIGH: "#ffa500",      # Orange
             Priority.MEDIUM: "#ffff00",    # Yellow
             Priority.LOW: "#00ff00",       # Green
             Priority.INFO: "#4287f5"       # Blue
-        }
+        })
         
         # Fixed incident duration based on priority
         self.priority_durations = {
@@ -124,15 +147,15 @@ class EmergencyResponseManager:
             6: "Medical Emergency"        # Medium
         }
         
-        # Resource combinations matching your test.py INCIDENTS
-        self.incident_resource_options = [
+        # Resource combinations matching your test.py INCIDENTS (read-only, shared by incidents)
+        self.incident_resource_options = tuple(MappingProxyType(needs) for needs in (
             {'Fire Trucks': 1, 'Ambulances': 1, 'Police Cars': 0},
             {'Fire Trucks': 1, 'Ambulances': 0, 'Police Cars': 0},
             {'Fire Trucks': 0, 'Ambulances': 0, 'Police Cars': 1},
             {'Fire Trucks': 0, 'Ambulances': 1, 'Police Cars': 1},
             {'Fire Trucks': 2, 'Ambulances': 0, 'Police Cars': 0},
             {'Fire Trucks': 0, 'Ambulances': 1, 'Police Cars': 0}
-        ]
+        ))
         
         # Assign fixed priorities to each incident type
         self.incident_priorities = {
@@ -151,25 +174,35 @@ class EmergencyResponseManager:
         random.seed(42)
         G = nx.grid_2d_graph(rows, cols)
 
-        mapping, idx = {}, 0
-        node_labels = ['HQ', 'A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I']
+        # Relabel grid cells and lay them out from their (row, col) coordinates
+        mapping, pos, idx = {}, {}, 0
         for r in range(rows):
             for c in range(cols):
-                mapping[(r, c)] = node_labels[idx]
+                mapping[(r, c)] = NODE_LABELS[idx]
+                pos[NODE_LABELS[idx]] = (c * 2, -r)
                 idx += 1
         G = nx.relabel_nodes(G, mapping)
+        G.graph['pos'] = pos
 
         # Assigns a random travel time between 5 and 60 minutes
         for u, v in G.edges():
             G.edges[u, v]['weight'] = random.randint(5, 60)
 
+        # Weights are fixed from here on, so build the edge label dict once
+        G.graph['_edge_labels'] = {(u, v): G.edges[u, v]['weight'] for u, v in G.edges()}
+
+        # ...and solve every shortest path once up front
+        G.graph['_dist'], G.graph['_paths'] = {}, {}
+        for n, (lengths, paths) in nx.all_pairs_dijkstra(G, weight='weight'):
+            G.graph['_dist'][n] = lengths
+            G.graph['_paths'][n] = paths
+
         return G
 
     def initialize_resources(self, G):
         for n in G.nodes:
-            G.nodes[n]['Fire Trucks'] = random.randint(0, 2)
-            G.nodes[n]['Ambulances'] = random.randint(0, 2)
-            G.nodes[n]['Police Cars'] = random.randint(0, 2)
+            for rt in RESOURCE_TYPES:
+                G.nodes[n][rt] = random.randint(0, 2)
     
     def create_ui(self):
         # Main frame
@@ -188,8 +221,8 @@ class EmergencyResponseManager:
         map_frame = ttk.LabelFrame(content_frame, text="Resource Map", padding=10)
         map_frame.grid(row=0, column=0, rowspan=2, padx=10, pady=10, sticky="nsew")
         
-        # Create the map visualization
-        self.create_map_visualization(map_frame)
+        # Create the map visualization once the window is up; matplotlib is slow to import
+        self.root.after_idle(self.create_map_visualization, map_frame)
         
         # Right side - Controls
         control_frame = ttk.LabelFrame(content_frame, text="Incident Management", padding=10)
@@ -253,8 +286,12 @@ class EmergencyResponseManager:
         
         # Selected incidents section
         ttk.Label(control_frame, text="Selected Incidents:").pack(anchor=tk.W, pady=(10, 5))
-        self.incident_list = tk.Listbox(control_frame, height=8, width=50, bg='#003366', fg='white')
-        self.incident_list.pack(fill=tk.X, pady=5)
+        self.incident_tree = ttk.Treeview(control_frame, show="tree", height=8, selectmode="browse",
+                                          style='Incidents.Treeview')
+        self.incident_tree.pack(fill=tk.X, pady=5)
+        # Row colors come from one tag per priority, configured once
+        for priority, color in self.priority_colors.items():
+            self.incident_tree.tag_configure(priority.name, foreground=color)
         
         # ─────────── Sort Incidents ───────────
         sort_frame = ttk.LabelFrame(control_frame, text="Sort Incidents", padding=10)
@@ -304,45 +341,111 @@ class EmergencyResponseManager:
         self.update_comboboxes()
     
     def create_map_visualization(self, frame):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        
         self.fig, self.ax = plt.subplots(figsize=(8, 7), dpi=100, facecolor='#001f3f')
         self.ax.set_facecolor('#001f3f')
         
         # Store positions for later use
-        self.pos = {n: ((self.node_labels.index(n) % 5) * 2, -(self.node_labels.index(n) // 5)) for n in self.G.nodes}
-        self.labels = {n: f"{n}\nFT:{self.G.nodes[n]['Fire Trucks']} AMB:{self.G.nodes[n]['Ambulances']}\nPC:{self.G.nodes[n]['Police Cars']}" for n in self.G.nodes}
+        self.pos = self.G.graph['pos']
+        nodes = self.G.nodes
+        self.labels = {n: self.format_node_label(n, nodes[n]) for n in nodes}
         
         # Draw the base graph
         self.draw_base_graph()
         
+        # Node labels and route overlays are animated artists, blitted over a cached background
+        self._route_artists = []
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        self.canvas.mpl_connect('draw_event', self._on_canvas_draw)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(expand=True, fill='both')
     
+    def _on_canvas_draw(self, event):
+        """Cache the static background after a full draw and repaint the labels and routes on it"""
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_overlays()
+    
+    def _draw_overlays(self):
+        """Draw the animated node labels, then the route overlays above them"""
+        for text in self._node_text.values():
+            self.ax.draw_artist(text)
+        for artist in self._route_artists:
+            self.ax.draw_artist(artist)
+    
+    def _blit_routes(self):
+        """Redraw only the node labels and route overlays on top of the cached background"""
+        self.canvas.restore_region(self._bg)
+        self._draw_overlays()
+        self.canvas.blit(self.ax.bbox)
+    
+    def format_node_label(self, n, counts):
+        return f"{n}\nFT:{counts['Fire Trucks']} AMB:{counts['Ambulances']}\nPC:{counts['Police Cars']}"
+    
     def draw_base_graph(self):
         """Draw the base graph without routes"""
+        from matplotlib.collections import LineCollection
         self.ax.clear()
-        
-        nx.draw(
-            self.G, self.pos,
-            labels=self.labels,
-            node_size=6000,
-            node_shape='s',
-            node_color='#004080',
+        pos = self.pos
+        
+        # Edges as a single LineCollection and nodes as a single scatter of squares
+        self.ax.add_collection(LineCollection(
+            [(pos[u], pos[v]) for u, v in self.G.edges()],
+            colors='black',
+            zorder=1
+        ))
+        xs, ys = zip(*(pos[n] for n in self.G.nodes))
+        self.ax.scatter(
+            xs, ys,
+            s=6000,
+            marker='s',
+            c='#004080',
             edgecolors='white',
-            font_size=12,
-            font_color='white',
-            ax=self.ax
+            zorder=2
         )
+        
+        # Keep the label artists so resource counts can be updated in place (and blitted)
+        self._node_text = {
+            n: self.ax.text(
+                *pos[n], self.labels[n],
+                fontsize=12,
+                color='white',
+                ha='center',
+                va='center',
+                clip_on=True,
+                animated=True
+            )
+            for n in self.G.nodes
+        }
         nx.draw_networkx_edge_labels(
             self.G, self.pos,
-            edge_labels=nx.get_edge_attributes(self.G, 'weight'),
+            edge_labels=self.G.graph['_edge_labels'],
             font_size=16,
             font_color='black',
             ax=self.ax
         )
-        self.ax.margins(0.1)
+
+        # Pad the view like nx.draw did (5% of the span, then a 10% margin) so the
+        # squares aren't clipped, and freeze it so route overlays can't rescale it
+        padx = 0.05 * (max(xs) - min(xs))
+        pady = 0.05 * (max(ys) - min(ys))
+        x0, x1 = min(xs) - padx, max(xs) + padx
+        y0, y1 = min(ys) - pady, max(ys) + pady
+        mx, my = 0.1 * (x1 - x0), 0.1 * (y1 - y0)
+        self.ax.set_xlim(x0 - mx, x1 + mx)
+        self.ax.set_ylim(y0 - my, y1 + my)
+        self.ax.set_autoscale_on(False)
         self.ax.axis('off')
 
+    def update_node_labels(self, stock=None):
+        """Show the given resource counts on the map without redrawing the graph"""
+        if stock is None:
+            stock = self._pristine_resources
+        for n, text in self._node_text.items():
+            text.set_text(self.format_node_label(n, stock[n]))
+        self._blit_routes()
+
     def update_comboboxes(self):
         # Format incident options to match resource combinations with priorities and descriptive names
         incident_options = [
@@ -376,176 +479,176 @@ class EmergencyResponseManager:
             messagebox.showwarning("Warning", "Please select both an incident type and location.")
             return
 
-        # Parse the time
+        # Parse the time (the combobox only offers fixed "HH:MM" values)
         try:
-            hours, minutes = map(int, time_str.split(":"))
-            incident_time = datetime.now().replace(hour=hours, minute=minutes)
+            hours = int(time_str[:2])
+            minutes = int(time_str[3:])
         except ValueError:
             messagebox.showwarning("Warning", "Invalid time format. Please use HH:MM.")
             return
 
-        # Extract the incident type from the selection
-        try:
-            # Find which incident type we're dealing with
-            incident_type_name = incident_option.split('(')[0].strip()
+        # Minutes since midnight are all that sorting and completion times need
+        incident_time_key = hours * 60 + minutes
+        time_str = format_minutes(incident_time_key)
 
-            # Find the incident type ID by name
-            incident_index = next(i for i, name in self.incident_types.items() if name == incident_type_name) - 1
+        # The combobox position is the incident index (-1 if the text doesn't match an option)
+        incident_index = self.incident_combo.current()
+        if incident_index < 0:
+            messagebox.showwarning("Warning", f"Invalid incident selection: {incident_option}")
+            return
 
-            resource_needs = self.get_resource_needs(incident_index)
-            priority = self.incident_priorities[incident_index + 1]
+        incident_type_name = self.incident_types[incident_index + 1]
+        resource_needs = self.get_resource_needs(incident_index)
+        priority = self.incident_priorities[incident_index + 1]
 
-            # Get the duration based on priority
-            duration = self.priority_durations[priority]
-        except (ValueError, IndexError, StopIteration) as e:
-            messagebox.showwarning("Warning", f"Invalid incident selection: {str(e)}")
-            return
+        # Get the duration based on priority
+        duration = self.priority_durations[priority]
 
         # Create incident entry for display with priority
         incident_entry = f"{incident_type_name} @ {location} ({time_str}) - {priority.name}"
 
+        # Add to the incident list, colored by its priority tag (rows mirror self.incidents)
+        iid = self.incident_tree.insert("", tk.END, text=incident_entry, tags=(priority.name,))
+
         # Add incident to our list with priority and type name
         self.incidents.append({
             "type": incident_type_name,
             "type_id": incident_index + 1,
             "node": location,
-            "time": incident_time,
+            "time": time_str,
             "needs": resource_needs,
             "priority": priority,
-            "duration": duration
+            "duration": duration,
+            "_pri_key": -priority.value,
+            "_time_key": incident_time_key,
+            "_iid": iid
         })
 
-        # Add to listbox with color coding
-        self.incident_list.insert(tk.END, incident_entry)
-        idx = self.incident_list.size() - 1
-        self.incident_list.itemconfig(idx, {'fg': self.priority_colors[priority]})
-
         # Clear selection
         self.incident_var.set("")
         self.location_var.set("")
     
     def remove_incident(self):
         try:
-            selected_idx = self.incident_list.curselection()[0]
-            self.incident_list.delete(selected_idx)
+            item = self.incident_tree.selection()[0]
+            selected_idx = self.incident_tree.index(item)
+            self.incident_tree.delete(item)
             self.incidents.pop(selected_idx)
         except IndexError:
             messagebox.showwarning("Warning", "Please select an incident to remove.")
     
     def clear_all_incidents(self):
-        self.incident_list.delete(0, tk.END)
+        self.incident_tree.delete(*self.incident_tree.get_children())
         self.incidents.clear()
         self.schedule_text.delete(1.0, tk.END)
         self.clear_route_highlights()
+        if hasattr(self, 'ax'):
+            self.update_node_labels()
     
     def shortest_path(self, src, dst):
-        import heapq
-        # Initialize distances and predecessors
-        dist = {node: float('inf') for node in self.G.nodes()}
-        prev = {node: None for node in self.G.nodes()}
-        dist[src] = 0
-
-        # Min-heap of (distance, node)
-        heap = [(0, src)]
-        visited = set()
-
-        while heap:
-            current_dist, u = heapq.heappop(heap)
-            if u in visited:
-                continue
-            visited.add(u)
-            # Early exit if we've reached the target
-            if u == dst:
-                break
-
-            # Relax all neighbors
-            for v, attrs in self.G[u].items():
-                w = attrs.get('weight', 1)
-                nd = current_dist + w
-                if nd < dist[v]:
-                    dist[v] = nd
-                    prev[v] = u
-                    heapq.heappush(heap, (nd, v))
-
-        # Reconstruct path from src → dst
-        path = []
-        if dist[dst] < float('inf'):
-            node = dst
-            while node is not None:
-                path.insert(0, node)
-                node = prev[node]
-
-        # Return (distance, path) 
-        return dist[dst], path
+        """Return (distance, path) from the precomputed all-pairs tables"""
+        if dst not in self._dist[src]:
+            return float('inf'), []
+        return self._dist[src][dst], self._path[src][dst]
     
-    def allocate_resources(self, G, incidents):
+    def allocate_resources(self, stock, incidents):
+        """Assign the nearest available units, decrementing the working stock dict"""
         assigns = {}
+        # Nodes still holding each resource type (dicts keep graph order for tie-breaks)
+        avail = {}
         for node, needs in incidents:
             assigns[node] = []
+            # The city graph is undirected, so the incident's own row holds every
+            # candidate's distance to it (and omits unreachable nodes)
+            lengths = self._dist[node]
             for rtype, count in needs.items():
-                for _ in range(count):
-                    best_node, best_d = None, float('inf')
-                    for cand in G.nodes:
-                        if G.nodes[cand][rtype] > 0:
-                            d, _ = self.shortest_path(cand, node)
-                            if d < best_d:
-                                best_d, best_node = d, cand
-                    if best_node:
-                        assigns[node].append((rtype, best_node, best_d))
-                        G.nodes[best_node][rtype] -= 1
-                    else:
-                        assigns[node].append((rtype, None, None))
+                if rtype not in avail:
+                    avail[rtype] = dict.fromkeys(n for n in self.G.nodes if stock[n][rtype] > 0)
+                # Walk reachable stocked nodes nearest-first; one node may supply several units,
+                # so at most `count` of the nearest can ever be needed
+                sources = heapq.nsmallest(
+                    count,
+                    (n for n in avail[rtype] if n in lengths),
+                    key=lengths.__getitem__
+                )
+                remaining = count
+                for src in sources:
+                    if remaining == 0:
+                        break
+                    taken = min(remaining, stock[src][rtype])
+                    assigns[node].extend([(rtype, src, lengths[src])] * taken)
+                    stock[src][rtype] -= taken
+                    remaining -= taken
+                    if stock[src][rtype] == 0:
+                        del avail[rtype][src]
+                # Units no node could supply
+                assigns[node].extend([(rtype, None, None)] * remaining)
         return assigns
     
     def highlight_routes(self, routes):
         """Highlight routes on the map"""
-        # Clear previous routes
-        self.clear_route_highlights()
+        import numpy as np
+        # Previous routes were already cleared by optimize_route
+        
+        # Local bindings for the per-route loop
+        G, pos, ax = self.G, self.pos, self.ax
+        priority_colors = self.priority_colors
+        route_artists = self._route_artists
+        
+        # Direction markers for every route, drawn as one scatter at the end
+        mids, mid_colors = [], []
         
         # Draw each route with a color based on priority
         for path, priority in routes:
-            color = self.priority_colors[priority]
+            color = priority_colors[priority]
             
             # Create the edges list
             edges = [(path[i], path[i+1]) for i in range(len(path)-1)]
             
             # Draw edges with arrows
-            nx.draw_networkx_edges(
-                self.G, self.pos,
+            edge_artists = nx.draw_networkx_edges(
+                G, pos,
                 edgelist=edges,
                 width=5,
                 edge_color=color,
                 arrows=True,
                 arrowstyle='-|>',
                 arrowsize=20,
-                ax=self.ax,
+                ax=ax,
                 alpha=0.7
             )
+            if not isinstance(edge_artists, list):
+                edge_artists = [edge_artists]
+            route_artists.extend(edge_artists)
             
-            # Add arrows indicating direction at midpoints of edges
-            for i in range(len(path)-1):
-                u, v = path[i], path[i+1]
-                u_pos, v_pos = self.pos[u], self.pos[v]
-                
-                # Calculate midpoint
-                mid_x = (u_pos[0] + v_pos[0]) / 2
-                mid_y = (u_pos[1] + v_pos[1]) / 2
-                
-                # Add a small node at the midpoint to indicate direction
-                self.ax.scatter(mid_x, mid_y, s=100, c=color, marker='>', zorder=5)
+            # Edge midpoints for the direction markers, computed for the whole path at once
+            pts = np.array([pos[n] for n in path], dtype=float)
+            mids.append((pts[:-1] + pts[1:]) / 2)
+            mid_colors.extend([color] * len(edges))
             
             # Store the current routes
             self.current_routes.append((edges, color))
         
-        # Redraw the canvas
-        self.canvas.draw()
+        # Add all midpoint markers as a single collection
+        if mid_colors:
+            mids = np.concatenate(mids)
+            route_artists.append(
+                ax.scatter(mids[:, 0], mids[:, 1], s=100, c=mid_colors, marker='>', zorder=5)
+            )
+        
+        # Exclude the overlays from full redraws and blit them onto the background
+        for artist in route_artists:
+            artist.set_animated(True)
+        self._blit_routes()
     
     def clear_route_highlights(self):
         """Clear all route highlights"""
         if hasattr(self, 'ax'):
-            # Redraw the base graph
-            self.draw_base_graph()
-            self.canvas.draw()
+            # Drop the overlays and blit the cached base graph back
+            for artist in self._route_artists:
+                artist.remove()
+            self._route_artists = []
+            self._blit_routes()
             
             # Clear stored routes
             self.current_routes = []
@@ -559,18 +662,14 @@ class EmergencyResponseManager:
         self.schedule_text.delete(1.0, tk.END)
         self.clear_route_highlights()
         
-        # Sort incidents by priority first, then by time
-        sorted_incidents = sorted(
-            self.incidents, 
-            key=lambda x: (-x["priority"].value, x["time"])
-        )
+        # Sort incidents by priority first, then by time, on the keys stored at add time
+        sorted_incidents = sorted(self.incidents, key=itemgetter("_pri_key", "_time_key"))
         
-        # Create a copy of the graph for resource allocation
-        G2 = self.build_city_graph()
-        self.initialize_resources(G2)
+        # Work on a copy of the starting resource counts instead of rebuilding the graph
+        stock = {n: dict(counts) for n, counts in self._pristine_resources.items()}
         
         # Allocate resources
-        alloc = self.allocate_resources(G2, [(inc["node"], inc["needs"]) for inc in sorted_incidents])
+        alloc = self.allocate_resources(stock, [(inc["node"], inc["needs"]) for inc in sorted_incidents])
         
         # Track routes to highlight and log info
         total_time = 0
@@ -578,37 +677,35 @@ class EmergencyResponseManager:
         routes_to_highlight = []
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # Display header
-        self.schedule_text.insert(tk.END, "Optimized Response Plan:\n\n")
+        # Build the plan one line per entry, recording which lines each priority tag covers
+        lines = ["Optimized Response Plan:\n", "\n"]
+        tag_ranges = {}
+        
+        # Local bindings for the per-incident loop
+        priority_durations = self.priority_durations
+        paths = self._path
+        completed_incidents = self.completed_incidents
         
         for i, incident in enumerate(sorted_incidents, 1):
-            # Track current position for tagging
-            line_start = self.schedule_text.index(tk.END)
-            
-            # Insert incident line with priority
-            duration = incident.get('duration', self.priority_durations[incident['priority']])
+            # Incident line with priority, colored by its tag
+            duration = incident.get('duration', priority_durations[incident['priority']])
             incident_text = f"{i}. {incident['type']} - {incident['priority'].name} Priority ({duration} min)\n"
-            self.schedule_text.insert(tk.END, incident_text)
-            
-            # Apply color tag
-            line_end = self.schedule_text.index(tk.END + "-1c")
-            tag_name = f"priority_{i}"
-            self.schedule_text.tag_configure(tag_name, foreground=self.priority_colors[incident['priority']])
-            self.schedule_text.tag_add(tag_name, line_start, line_end)
-            
-            # Add incident details
-            self.schedule_text.insert(tk.END, f"   Location: {incident['node']}\n")
-            self.schedule_text.insert(tk.END, f"   Time: {incident['time'].strftime('%H:%M')}\n")
+            line_no = len(lines) + 1
+            tag_ranges.setdefault(incident['priority'], []).extend((f"{line_no}.0", f"{line_no}.end"))
             
             # Calculate estimated completion time
-            completion_time = incident['time'] + timedelta(minutes=duration)
-            self.schedule_text.insert(tk.END, f"   Est. Completion: {completion_time.strftime('%H:%M')}\n")
+            completion_time = format_minutes(incident['_time_key'] + duration)
             
-            self.schedule_text.insert(tk.END, "   Resources:\n")
+            # Add incident details
+            lines.append(incident_text)
+            lines.append(f"   Location: {incident['node']}\n")
+            lines.append(f"   Time: {incident['time']}\n")
+            lines.append(f"   Est. Completion: {completion_time}\n")
+            lines.append("   Resources:\n")
             
             # Create incident log entry
             incident_log = {
-                "id": f"INC-{len(self.completed_incidents) + 1:03d}",
+                "id": f"INC-{len(completed_incidents) + 1:03d}",
                 "type": incident['type'],
                 "node": incident['node'],
                 "time": incident['time'],
@@ -620,11 +717,12 @@ class EmergencyResponseManager:
             }
             
             locations_visited.add(incident['node'])
+            routed_from = set()
             
             # Process each resource allocation
             for r, src, d in alloc[incident['node']]:
                 if src:
-                    self.schedule_text.insert(tk.END, f"     {r} from {src} ({d}min)\n")
+                    lines.append(f"     {r} from {src} ({d}min)\n")
                     total_time += d
                     locations_visited.add(src)
                     
@@ -635,57 +733,45 @@ class EmergencyResponseManager:
                         "time": d
                     })
                     
-                    # Add route to highlight
-                    path = nx.shortest_path(self.G, src, incident['node'], weight='weight')
-                    routes_to_highlight.append((path, incident['priority']))
+                    # Add route to highlight, once per source for this incident
+                    if src not in routed_from:
+                        routed_from.add(src)
+                        routes_to_highlight.append((paths[src][incident['node']], incident['priority']))
                 else:
-                    self.schedule_text.insert(tk.END, f"     No {r} available\n")
+                    lines.append(f"     No {r} available\n")
             
-            self.schedule_text.insert(tk.END, "\n")
+            lines.append("\n")
             
             # Add to completed incidents log
-            self.completed_incidents.append(incident_log)
+            completed_incidents.append(incident_log)
         
         # Add summary
-        self.schedule_text.insert(tk.END, f"Summary:\n")
-        self.schedule_text.insert(tk.END, f"Number of incidents: {len(sorted_incidents)}\n")
-        self.schedule_text.insert(tk.END, f"Number of locations: {len(locations_visited)}\n")
-        self.schedule_text.insert(tk.END, f"Total response time: {total_time} minutes\n")
-        
-        # Highlight routes on the map
+        lines.append(f"Summary:\n")
+        lines.append(f"Number of incidents: {len(sorted_incidents)}\n")
+        lines.append(f"Number of locations: {len(locations_visited)}\n")
+        lines.append(f"Total response time: {total_time} minutes\n")
+        
+        # Insert the whole plan at once, then color each priority's lines with one tag_add
+        self.schedule_text.insert("1.0", "".join(lines))
+        for priority, ranges in tag_ranges.items():
+            tag_name = f"priority_{priority.name}"
+            self.schedule_text.tag_configure(tag_name, foreground=self.priority_colors[priority])
+            self.schedule_text.tag_add(tag_name, *ranges)
+        
+        # Highlight routes on the map and show the units left at each node
         self.highlight_routes(routes_to_highlight)
+        self.update_node_labels(stock)
     
-    def generate_routes_log(self):
-        """Generate log of all routed incidents"""
-        if not self.completed_incidents:
-            messagebox.showinfo("Info", "No incidents have been routed yet.")
-            return
-        
-        # Create log window
-        log_window = tk.Toplevel(self.root)
-        log_window.title("Routes Log")
-        log_window.geometry("700x500")
-        log_window.configure(bg='#001f3f')
-        
-        # Create log frame
-        log_frame = ttk.Frame(log_window, padding=10)
-        log_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Create text widget for log
-        log_text = tk.Text(log_frame, width=80, height=30, bg='#003366', fg='white')
-        log_text.pack(fill=tk.BOTH, expand=True)
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(log_text, command=log_text.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        log_text.config(yscrollcommand=scrollbar.set)
-        
-        # Insert log header
-        log_text.insert(tk.END, "===== EMERGENCY RESPONSE ROUTES LOG =====\n\n")
+    def _format_log_lines(self, records):
+        """
+        Yield the routes log for the given incident records as (text, priority) chunks
+        priority is set only on the chunks that should be colored
+        """
+        yield "===== EMERGENCY RESPONSE ROUTES LOG =====\n\n", None
         
         # Group by optimization batch
         by_timestamp = {}
-        for incident in self.completed_incidents:
+        for incident in records:
             timestamp = incident["timestamp"]
             if timestamp not in by_timestamp:
                 by_timestamp[timestamp] = []
@@ -693,8 +779,8 @@ class EmergencyResponseManager:
         
         # Process each batch
         for timestamp, incidents in by_timestamp.items():
-            log_text.insert(tk.END, f"=== Batch: {timestamp} ===\n")
-            log_text.insert(tk.END, f"Number of Incidents: {len(incidents)}\n\n")
+            yield f"=== Batch: {timestamp} ===\n", None
+            yield f"Number of Incidents: {len(incidents)}\n\n", None
             
             # Track batch statistics
             total_routes = 0
@@ -703,34 +789,30 @@ class EmergencyResponseManager:
             
             # Process each incident
             for incident in incidents:
-                # Set priority tag
-                priority_tag = f"priority_{incident['priority'].name}"
-                log_text.tag_configure(priority_tag, foreground=self.priority_colors[incident['priority']])
-                
-                # Insert incident details
-                log_text.insert(tk.END, f"Incident: {incident['id']}\n")
-                log_text.insert(tk.END, f"Type: {incident['type']}\n")
-                log_text.insert(tk.END, f"Location: {incident['node']}\n")
-                log_text.insert(tk.END, f"Time: {incident['time'].strftime('%H:%M')}\n")
+                # Incident details
+                yield f"Incident: {incident['id']}\n", None
+                yield f"Type: {incident['type']}\n", None
+                yield f"Location: {incident['node']}\n", None
+                yield f"Time: {incident['time']}\n", None
                 
                 # Add completion time if available
                 if 'completion_time' in incident:
-                    log_text.insert(tk.END, f"Est. Completion: {incident['completion_time'].strftime('%H:%M')}\n")
+                    yield f"Est. Completion: {incident['completion_time']}\n", None
                 
-                # Insert priority with color
-                log_text.insert(tk.END, "Priority: ")
-                log_text.insert(tk.END, f"{incident['priority'].name}", priority_tag)
-                log_text.insert(tk.END, f" ({incident.get('duration', 0)} min)\n")
+                # Priority with color
+                yield "Priority: ", None
+                yield incident['priority'].name, incident['priority']
+                yield f" ({incident.get('duration', 0)} min)\n", None
                 
-                # Insert routes
-                log_text.insert(tk.END, "Routes:\n")
+                # Routes
+                yield "Routes:\n", None
                 
                 # Process resources/routes
                 incident_time = 0
                 if incident['resources']:
                     for resource in incident['resources']:
                         route_str = f"  {resource['type']} from {resource['source']} to {incident['node']} ({resource['time']}min)"
-                        log_text.insert(tk.END, f"{route_str}\n")
+                        yield f"{route_str}\n", None
                         
                         incident_time += resource['time']
                         total_time += resource['time']
@@ -738,19 +820,64 @@ class EmergencyResponseManager:
                         
                         all_routes.append(f"{resource['source']} → {incident['node']}")
                     
-                    log_text.insert(tk.END, f"Total Route Time: {incident_time} minutes\n")
+                    yield f"Total Route Time: {incident_time} minutes\n", None
                 else:
-                    log_text.insert(tk.END, "  No resources allocated\n")
+                    yield "  No resources allocated\n", None
                 
-                log_text.insert(tk.END, "\n")
+                yield "\n", None
             
-            # Add batch summary
-            log_text.insert(tk.END, "Batch Summary:\n")
-            log_text.insert(tk.END, f"Total Routes: {total_routes}\n")
-            log_text.insert(tk.END, f"Total Travel Time: {total_time} minutes\n")
+            # Batch summary
+            yield "Batch Summary:\n", None
+            yield f"Total Routes: {total_routes}\n", None
+            yield f"Total Travel Time: {total_time} minutes\n", None
             if all_routes:
-                log_text.insert(tk.END, f"Routes: {', '.join(all_routes)}\n")
-            log_text.insert(tk.END, "\n\n")
+                yield f"Routes: {', '.join(all_routes)}\n", None
+            yield "\n\n", None
+    
+    def generate_routes_log(self):
+        """Generate log of all routed incidents"""
+        if not self.completed_incidents:
+            messagebox.showinfo("Info", "No incidents have been routed yet.")
+            return
+        
+        # Create log window
+        log_window = tk.Toplevel(self.root)
+        log_window.title("Routes Log")
+        log_window.geometry("700x500")
+        log_window.configure(bg='#001f3f')
+        
+        # Create log frame
+        log_frame = ttk.Frame(log_window, padding=10)
+        log_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Create text widget for log
+        log_text = tk.Text(log_frame, width=80, height=30, bg='#003366', fg='white')
+        log_text.pack(fill=tk.BOTH, expand=True)
+        
+        # Add scrollbar
+        scrollbar = ttk.Scrollbar(log_text, command=log_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        log_text.config(yscrollcommand=scrollbar.set)
+        
+        # Snapshot the records so Export Log writes exactly what this window shows
+        records = list(self.completed_incidents)
+        
+        # Insert the whole log at once, recording character ranges of the colored chunks
+        chunks = []
+        tag_ranges = {}
+        offset = 0
+        for text, priority in self._format_log_lines(records):
+            if priority is not None:
+                tag_ranges.setdefault(priority, []).extend((f"1.0+{offset}c", f"1.0+{offset + len(text)}c"))
+            chunks.append(text)
+            offset += len(text)
+        log_text.insert("1.0", "".join(chunks))
+        
+        # Apply one tag_add per priority
+        for priority, ranges in tag_ranges.items():
+            priority_tag = f"priority_{priority.name}"
+            log_text.tag_configure(priority_tag, foreground=self.priority_colors[priority])
+            log_text.tag_add(priority_tag, *ranges)
         
         # Make text read-only
         log_text.config(state=tk.DISABLED)
@@ -769,8 +896,9 @@ class EmergencyResponseManager:
                 # Create log file with timestamp
                 filename = f"logs/routes_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
                 
+                # Stream from this window's record snapshot rather than copying the widget text
                 with open(filename, "w") as f:
-                    f.write(log_text.get("1.0", tk.END))
+                    f.writelines(text for text, _ in self._format_log_lines(records))
                 
                 messagebox.showinfo("Export Successful", f"Log exported to {filename}")
             except Exception as e:
@@ -779,20 +907,12 @@ class EmergencyResponseManager:
         ttk.Button(export_frame, text="Export Log", command=export_log).pack(side=tk.RIGHT, padx=10)
 
     def sort_incidents(self):
-        # choose key
-        if self.sort_var.get() == "Priority":
-            key = lambda inc: -inc["priority"].value
-        else:
-            key = lambda inc: inc["time"]
-        # sort & refresh listbox
+        # choose key (precomputed at add time)
+        key = itemgetter("_pri_key" if self.sort_var.get() == "Priority" else "_time_key")
+        # sort & reorder the existing rows; text and tags stay as they are
         self.incidents = merge_sort(self.incidents, key=key)
-        self.incident_list.delete(0, tk.END)
-        for inc in self.incidents:
-            txt = f"{inc['type']} @ {inc['node']} ({inc['time'].strftime('%H:%M')})"
-            self.incident_list.insert(tk.END, txt)
-            self.incident_list.itemconfig(
-                tk.END, {'fg': self.priority_colors[inc['priority']]}
-            )
+        for idx, inc in enumerate(self.incidents):
+            self.incident_tree.move(inc["_iid"], "", idx)
 
     def search_logs(self):
         kw = self.search_var.get().strip().lower()
@@ -817,7 +937,7 @@ class EmergencyResponseManager:
                     f"Type: {m['type']}\n"
                     f"Loc:  {m['node']}\n"
                     f"Prio: {m['priority'].name}\n"
-                    f"Time: {m['time'].strftime('%H:%M')}\n\n"
+                    f"Time: {m['time']}\n\n"
                 )
         txt.config(state=tk.DISABLED)
 